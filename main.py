@@ -13,12 +13,53 @@ from agent import setup_a2a_server
 # Load environment variables from .env file
 load_dotenv()
 
+# The environment is read and parsed once at import; argparse defaults and
+# the worker app factory both draw from these constants instead of re-reading
+# and re-converting os.environ on every use.
+DEFAULT_HOST = os.getenv("A2A_HOST", "localhost")
+DEFAULT_PORT = int(os.getenv("A2A_PORT", "10001"))
+DEFAULT_CACHE_DIR = os.getenv("A2A_CACHE_DIR") or None
+DEFAULT_MAX_CONNECTIONS = int(os.getenv("A2A_MAX_CONNECTIONS", "512"))
+DEFAULT_OPENAI_CONCURRENCY = int(os.getenv("OPENAI_CONCURRENCY", "8"))
+DEFAULT_USE_CREW = os.getenv("A2A_USE_CREW") == "1"
+DEFAULT_DURABLE_CACHE = os.getenv("A2A_DURABLE_CACHE") == "1"
+DEFAULT_WORKERS = int(os.getenv("WEB_CONCURRENCY", "1"))
+
+def create_app():
+    """App factory for uvicorn workers.
+
+    Worker processes cannot see parsed CLI arguments, so main() forwards the
+    configuration through environment variables; each worker parses them once
+    at import into the module-level defaults above.
+    """
+    return setup_a2a_server(
+        cache_dir=DEFAULT_CACHE_DIR,
+        max_connections=DEFAULT_MAX_CONNECTIONS,
+        openai_concurrency=DEFAULT_OPENAI_CONCURRENCY,
+        use_crew=DEFAULT_USE_CREW,
+        durable_cache=DEFAULT_DURABLE_CACHE,
+    )
+
 def main():
     """Main entry point for the application"""
     parser = argparse.ArgumentParser(description="Run the CrewAI image generation agent with A2A protocol")
-    parser.add_argument("--host", type=str, default="localhost", help="Host to bind the server to")
-    parser.add_argument("--port", type=int, default=10001, help="Port to bind the server to")
-    parser.add_argument("--cache-dir", type=str, default=None, help="Directory to store cached images")
+    parser.add_argument("--host", type=str, default=DEFAULT_HOST, help="Host to bind the server to")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT, help="Port to bind the server to")
+    parser.add_argument("--cache-dir", type=str, default=DEFAULT_CACHE_DIR, help="Directory to store cached images")
+    parser.add_argument("--max-connections", type=int, default=DEFAULT_MAX_CONNECTIONS,
+                        help="Connection pool size for the OpenAI client (match to your API tier)")
+    parser.add_argument("--openai-concurrency", type=int, default=DEFAULT_OPENAI_CONCURRENCY,
+                        help="Maximum concurrent OpenAI calls (keep below your rate limit)")
+    parser.add_argument("--use-crew", action="store_true", default=DEFAULT_USE_CREW,
+                        help="Route tasks through the CrewAI agent instead of calling DALL-E directly")
+    parser.add_argument("--durable-cache", action="store_true", default=DEFAULT_DURABLE_CACHE,
+                        help="fdatasync each cache file and rename it into place atomically (off by default; cached images are regenerable)")
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS,
+                        help="Number of uvicorn worker processes")
+    parser.add_argument("--loop", type=str, default="uvloop",
+                        help="Event loop implementation for uvicorn (uvloop/asyncio/auto)")
+    parser.add_argument("--http", type=str, default="httptools",
+                        help="HTTP protocol implementation for uvicorn (httptools/h11/auto)")
     args = parser.parse_args()
 
     # Check if OpenAI API key is present
@@ -27,11 +68,20 @@ def main():
         print("Please set it in a .env file or export it in your shell")
         return 1
 
+    # Forward configuration to the worker processes through the environment
+    if args.cache_dir:
+        os.environ["A2A_CACHE_DIR"] = args.cache_dir
+    os.environ["A2A_MAX_CONNECTIONS"] = str(args.max_connections)
+    os.environ["OPENAI_CONCURRENCY"] = str(args.openai_concurrency)
+    if args.use_crew:
+        os.environ["A2A_USE_CREW"] = "1"
+    if args.durable_cache:
+        os.environ["A2A_DURABLE_CACHE"] = "1"
+
     # Start the A2A server
-    app = setup_a2a_server(cache_dir=args.cache_dir)
-    
-    print(f"Starting A2A server at http://{args.host}:{args.port}")
-    uvicorn.run(app, host=args.host, port=args.port)
+    print(f"Starting A2A server at http://{args.host}:{args.port} ({args.workers} worker(s))")
+    uvicorn.run("main:create_app", factory=True, host=args.host, port=args.port,
+                workers=args.workers, loop=args.loop, http=args.http)
 
 if __name__ == "__main__":
     main()
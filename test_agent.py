@@ -5,18 +5,32 @@
 
 import requests
 import json
-import base64
 import argparse
+import re
+
+try:
+    # SIMD-прискорена заміна стандартного модуля base64 (ті самі виклики)
+    import pybase64 as base64
+except ImportError:
+    import base64
 from PIL import Image
 import io
 import os
 from datetime import datetime
 
+# Спільна HTTP-сесія: повторно використовує TCP-з'єднання замість
+# нового handshake на кожен запит
+SESSION = requests.Session()
+
+# Патерни компілюються один раз під час імпорту, а не на кожен виклик
+LABELLED_ID_RE = re.compile(r'ID:\s*([a-f0-9-]+)', re.IGNORECASE)
+UUID_RE = re.compile(r'([a-f0-9]{8}-[a-f0-9]{4}-[a-f0-9]{4}-[a-f0-9]{4}-[a-f0-9]{12})')
+
 def test_health(base_url):
     """Перевірка працездатності агента"""
     url = f"{base_url}/a2a/healthz"
     try:
-        response = requests.get(url, timeout=10)  # Додано таймаут 10 секунд
+        response = SESSION.get(url, timeout=10)  # Додано таймаут 10 секунд
         if response.status_code == 200:
             print("✅ Агент працює")
             return True
@@ -31,7 +45,7 @@ def get_metadata(base_url):
     """Отримання метаданих агента"""
     url = f"{base_url}/a2a/metadata"
     try:
-        response = requests.get(url, timeout=10)  # Додано таймаут 10 секунд
+        response = SESSION.get(url, timeout=10)  # Додано таймаут 10 секунд
         if response.status_code == 200:
             print("✅ Метадані агента:")
             print(json.dumps(response.json(), indent=2))
@@ -56,7 +70,7 @@ def generate_image(base_url, prompt, output_dir="./generated_images"):
     print(f"📤 Відправляю запит: '{prompt}'")
     
     try:
-        response = requests.post(url, json=payload, timeout=30)  # Збільшений таймаут для генерації зображень
+        response = SESSION.post(url, json=payload, timeout=30)  # Збільшений таймаут для генерації зображень
         
         if response.status_code != 200:
             print(f"❌ Помилка: {response.status_code}, {response.text}")
@@ -118,18 +132,16 @@ def edit_image(base_url, image_id, edit_prompt, output_dir="./generated_images")
 
 def extract_image_id(text):
     """Витягнення ID зображення з тексту"""
-    import re
-    
     # Шукаємо патерни типу "ID: abc-123" або "with ID: abc-123"
-    match = re.search(r'ID:\s*([a-f0-9-]+)', text, re.IGNORECASE)
+    match = LABELLED_ID_RE.search(text)
     if match:
         return match.group(1)
-    
+
     # Шукаємо UUID в тексті
-    uuids = re.findall(r'([a-f0-9]{8}-[a-f0-9]{4}-[a-f0-9]{4}-[a-f0-9]{4}-[a-f0-9]{12})', text)
-    if uuids:
-        return uuids[0]
-    
+    match = UUID_RE.search(text)
+    if match:
+        return match.group(1)
+
     return None
 
 def get_image_by_id(base_url, image_id, output_dir="./generated_images"):
@@ -137,7 +149,7 @@ def get_image_by_id(base_url, image_id, output_dir="./generated_images"):
     url = f"{base_url}/image/{image_id}"
     
     try:
-        response = requests.get(url, timeout=10)  # Додано таймаут
+        response = SESSION.get(url, timeout=10)  # Додано таймаут
         
         if response.status_code != 200:
             print(f"❌ Помилка: {response.status_code}, {response.text}")